@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+#
+# SPDX-License-Identifier: Apache-2.0
+
+"""tests for zephyr_module.py"""
+
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.environ["ZEPHYR_BASE"], "scripts"))
+import zephyr_module as iut  # Implementation Under Test
+
+SHA_1 = "1" * 40
+SHA_2 = "2" * 40
+
+
+def git(path, *args):
+    """Run git in path and return its output"""
+    return subprocess.run(["git", "-C", str(path), "-c", "user.name=test",
+                           "-c", "user.email=test@example.com", *args],
+                          check=True, capture_output=True,
+                          text=True).stdout.strip()
+
+
+def git_repo(path):
+    """Create a git repository with a single commit in path"""
+    path.mkdir(parents=True, exist_ok=True)
+    git(path, "init", "-q")
+    (path / "file.txt").write_text("content\n")
+    git(path, "add", "file.txt")
+    git(path, "commit", "-q", "-m", "initial")
+    return git(path, "rev-parse", "HEAD")
+
+
+def fake_git_dir(path, head):
+    """Create a .git folder in path which only contains HEAD"""
+    git_dir = path / ".git"
+    git_dir.mkdir(parents=True)
+    (git_dir / "HEAD").write_text(head)
+    return git_dir
+
+
+def test_git_head_detached(tmp_path):
+    """Test HEAD holding a SHA"""
+    fake_git_dir(tmp_path, f"{SHA_1}\n")
+    assert iut.git_head(tmp_path) == SHA_1
+
+
+def test_git_head_loose_ref(tmp_path):
+    """Test HEAD pointing to a loose ref"""
+    git_dir = fake_git_dir(tmp_path, "ref: refs/heads/main\n")
+    (git_dir / "refs" / "heads").mkdir(parents=True)
+    (git_dir / "refs" / "heads" / "main").write_text(f"{SHA_1}\n")
+    assert iut.git_head(tmp_path) == SHA_1
+
+
+def test_git_head_packed_ref(tmp_path):
+    """Test HEAD pointing to a packed ref"""
+    git_dir = fake_git_dir(tmp_path, "ref: refs/heads/main\n")
+    (git_dir / "packed-refs").write_text(
+        "# pack-refs with: peeled fully-peeled sorted\n"
+        f"{SHA_2} refs/heads/other\n"
+        f"{SHA_1} refs/heads/main\n")
+    assert iut.git_head(tmp_path) == SHA_1
+
+
+def test_git_head_unborn_branch(tmp_path):
+    """Test HEAD pointing to a branch without commits"""
+    fake_git_dir(tmp_path, "ref: refs/heads/main\n")
+    assert iut.git_head(tmp_path) is None
+
+
+def test_git_head_git_file(tmp_path):
+    """Test .git being a file, as used by worktrees and submodules"""
+    (tmp_path / ".git").write_text("gitdir: /somewhere/else\n")
+    assert iut.git_head(tmp_path) is None
+
+
+def test_git_revision(tmp_path):
+    """Test revision of a clean and a dirty repository"""
+    sha = git_repo(tmp_path)
+    assert iut.git_revision(str(tmp_path)) == sha
+
+    (tmp_path / "file.txt").write_text("changed\n")
+    assert iut.git_revision(str(tmp_path)) == f"{sha}-dirty"
+
+
+def test_git_revision_not_a_repo(tmp_path):
+    """Test a path which is not in a git repository"""
+    assert iut.git_revision(str(tmp_path)) is None
+
+
+def test_git_revision_symlink(tmp_path):
+    """Test a symbolic link into a subfolder of a git repository"""
+    sha = git_repo(tmp_path / "repo")
+    (tmp_path / "repo" / "mods" / "m").mkdir(parents=True)
+    (tmp_path / "link").symlink_to(tmp_path / "repo" / "mods" / "m")
+    assert iut.git_revision(str(tmp_path / "link")) == sha
+
+
+def test_git_revision_unusable_repo(tmp_path):
+    """Test git failing on a repository which HEAD could be read from"""
+    git_repo(tmp_path)
+    (tmp_path / ".git" / "HEAD").write_text(f"{SHA_1}\n")
+    assert iut.git_head(tmp_path) == SHA_1
+    assert iut.git_revision(str(tmp_path)) is None
+
+
+def module(path, module_yml=None, files=()):
+    """Create a module in path with the given zephyr folder content"""
+    zephyr_dir = path / "zephyr"
+    zephyr_dir.mkdir(parents=True)
+    if module_yml is not None:
+        (zephyr_dir / "module.yml").write_text(module_yml)
+    for name in files:
+        (zephyr_dir / name).write_text("")
+    return str(path)
+
+
+def test_validate_meta():
+    """Test module.yml content validation and default values"""
+    meta = {"name": "foo", "build": {"cmake": "zephyr",
+                                     "depends": ["bar"]}}
+    assert iut.validate_meta(meta) == []
+    assert meta["build"]["cmake-ext"] is False
+    assert meta["build"]["kconfig-ext"] is False
+
+    assert iut.validate_meta({"build": {"cmake": ["zephyr"], "foo": 1},
+                              "tests": ["a", 2]}) == [
+        "Value '['zephyr']' is not of type 'str'. Path: '/build/cmake'",
+        "Key 'foo' was not defined. Path: '/build'",
+        "Value '2' is not of type 'str'. Path: '/tests/1'"]
+    assert iut.validate_meta(None) == [
+        "Value 'None' is not a dict. Value path: ''"]
+
+
+def cache_files(cache_home):
+    """Return the names of the module.yml cache files"""
+    cache_dir = cache_home / "zephyr" / "module_meta"
+    return sorted(os.listdir(cache_dir)) if cache_dir.exists() else []
+
+
+@pytest.fixture
+def cache_home(tmp_path, monkeypatch):
+    """Use a fresh user cache directory"""
+    home = tmp_path / "cache"
+    home.mkdir()
+    monkeypatch.setenv("XDG_CACHE_HOME", str(home))
+    monkeypatch.delenv("ZEPHYR_MODULE_CACHE_DISABLE", raising=False)
+    monkeypatch.setattr(sys, "platform", "linux")
+    return home
+
+
+def test_process_module_malformed(tmp_path, cache_home):
+    """Test a module.yml file not matching the schema"""
+    mod = module(tmp_path / "mod", "build:\n  cmake: [zephyr]\n")
+    with pytest.raises(SystemExit, match="Malformed"):
+        iut.process_module(mod)
+    assert cache_files(cache_home) == []
+
+
+def test_meta_cache_hit(tmp_path, cache_home, monkeypatch):
+    """Test an unchanged module.yml is read from the cache"""
+    mod = module(tmp_path / "mod", "name: foo\nbuild:\n  cmake: .\n")
+    meta = iut.process_module(mod)
+    assert len(cache_files(cache_home)) == 1
+
+    monkeypatch.setattr(iut, "yaml_load", None)
+    assert iut.process_module(mod) == meta
+
+
+def test_meta_cache_same_size_and_mtime(tmp_path, cache_home):
+    """Test an edit keeping size and mtime is not hidden by the cache"""
+    mod = module(tmp_path / "mod", "build:\n  cmake: .\n")
+    module_yml = tmp_path / "mod" / "zephyr" / "module.yml"
+    st = module_yml.stat()
+    assert iut.process_module(mod)["build"]["cmake"] == "."
+
+    module_yml.write_text("build:\n  cmake: x\n")
+    os.utime(module_yml, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert iut.process_module(mod)["build"]["cmake"] == "x"
+    assert len(cache_files(cache_home)) == 2
+
+
+def test_meta_cache_foreign_entry(tmp_path, cache_home):
+    """Test a cache entry not holding meta data is ignored"""
+    mod = module(tmp_path / "mod", "name: foo\n")
+    meta = iut.process_module(mod)
+    cache_file = cache_home / "zephyr" / "module_meta" / \
+        cache_files(cache_home)[0]
+
+    for content in ("[]", '"x"', "{"):
+        cache_file.write_text(content)
+        assert iut.process_module(mod) == meta
+
+
+def test_meta_cache_disable(tmp_path, cache_home, monkeypatch):
+    """Test the cache can be disabled"""
+    monkeypatch.setenv("ZEPHYR_MODULE_CACHE_DISABLE", "1")
+    iut.process_module(module(tmp_path / "mod", "name: foo\n"))
+    assert cache_files(cache_home) == []
+
+
+def test_meta_cache_prune(tmp_path, cache_home):
+    """Test unused cache entries are removed"""
+    iut.process_module(module(tmp_path / "old", "name: old\n"))
+    old_entry = cache_files(cache_home)[0]
+    cache_dir = cache_home / "zephyr" / "module_meta"
+    expired = time.time() - iut.META_CACHE_MAX_AGE - 60
+    os.utime(cache_dir / old_entry, (expired, expired))
+
+    iut.process_module(module(tmp_path / "new", "name: new\n"))
+    entries = cache_files(cache_home)
+    assert len(entries) == 1
+    assert old_entry not in entries
+
+
+def test_default_build_files(tmp_path, monkeypatch):
+    """Test default zephyr/CMakeLists.txt and zephyr/Kconfig detection"""
+    monkeypatch.setenv("ZEPHYR_MODULE_CACHE_DISABLE", "1")
+    mod = module(tmp_path / "mod", "name: foo\n", ["CMakeLists.txt"])
+    meta = iut.process_module(mod)
+    assert meta == {"name": "foo", "name-sanitized": "foo"}
+
+    cmake_dir = (tmp_path / "mod" / "zephyr").as_posix()
+    assert iut.process_cmake(mod, meta) == f'"foo":"{mod}":"{cmake_dir}"\n'
+    assert iut.process_kconfig(mod, meta) == ""
+
+
+def test_unlistable_zephyr_folder(tmp_path, monkeypatch):
+    """Test a zephyr folder which can be traversed but not listed"""
+    def scandir(path):
+        raise PermissionError(path)
+
+    monkeypatch.setenv("ZEPHYR_MODULE_CACHE_DISABLE", "1")
+    monkeypatch.setattr(iut.os, "scandir", scandir)
+    mod = module(tmp_path / "mod", files=["CMakeLists.txt", "Kconfig"])
+    assert iut.process_module(mod)["name"] == "mod"
@@ -15,17 +15,24 @@ Using --twister-out <filename> an argument file for twister script will
 be generated which would point to test and sample roots available in modules
 that can be included during a twister run. This allows testing code
 maintained in modules in addition to what is available in the main Zephyr tree.
+
+The validated content of zephyr/module.yml files is cached in the user cache
+directory. Set the ZEPHYR_MODULE_CACHE_DISABLE environment variable to a
+non-empty value to disable this cache.
 '''
 
 import argparse
+import concurrent.futures
+import functools
+import hashlib
+import json
 import os
 import re
 import subprocess
 import sys
-import yaml
-import pykwalify.core
+import time
 from pathlib import Path, PurePath
-from collections import namedtuple
+from collections import defaultdict, deque, namedtuple
 
 METADATA_SCHEMA = '''
 ## A pykwalify schema for basic validation of the structure of a
@@ -97,7 +104,143 @@ mapping:
       - type: str
 '''
 
-schema = yaml.safe_load(METADATA_SCHEMA)
+GIT_SHA_RE = re.compile('[0-9a-f]{40}|[0-9a-f]{64}')
+
+NAME_SANITIZE_RE = re.compile('[^a-zA-Z0-9]')
+
+CASE_INSENSITIVE_FS = sys.platform in ('win32', 'darwin')
+
+# Cached module.yml content not used for this long is removed, in seconds.
+META_CACHE_MAX_AGE = 30 * 24 * 60 * 60
+
+# yaml is imported on first use, as it is slow to import and not needed
+# when all module.yml files are found in the cache.
+
+
+def yaml_load(stream):
+    import yaml
+    try:
+        # Use the C LibYAML parser if available, rather than the Python
+        # parser. It's much faster.
+        from yaml import CSafeLoader as SafeLoader
+    except ImportError:
+        from yaml import SafeLoader
+    return yaml.load(stream, Loader=SafeLoader)
+
+
+def yaml_dump(data):
+    import yaml
+    try:
+        from yaml import CSafeDumper as SafeDumper
+    except ImportError:
+        from yaml import SafeDumper
+    return yaml.dump(data, Dumper=SafeDumper)
+
+
+def compile_rule(rule):
+    # Compile a rule of METADATA_SCHEMA into a function validating a value
+    # against it, which appends pykwalify style messages to the errors list
+    # and fills in default values like pykwalify does.
+    #
+    # Only the subset of pykwalify used by METADATA_SCHEMA is supported:
+    # the map, seq, str, and bool types and the mapping, sequence,
+    # required, and default keywords.
+    rule_type = rule['type']
+
+    if rule_type == 'map':
+        mapping = {key: (compile_rule(sub_rule), sub_rule)
+                   for key, sub_rule in rule['mapping'].items()}
+
+        def validate(value, path, errors):
+            if not isinstance(value, dict):
+                errors.append(f"Value '{value}' is not a dict. "
+                              f"Value path: '{path}'")
+                return
+            for key, (validate_key, sub_rule) in mapping.items():
+                if key in value:
+                    validate_key(value[key], f'{path}/{key}', errors)
+                elif sub_rule.get('required', False):
+                    errors.append(f"Cannot find required key '{key}'. "
+                                  f"Path: '{path}'")
+                elif 'default' in sub_rule:
+                    value[key] = sub_rule['default']
+            for key in value:
+                if key not in mapping:
+                    errors.append(f"Key '{key}' was not defined. "
+                                  f"Path: '{path}'")
+    elif rule_type == 'seq':
+        validate_item = compile_rule(rule['sequence'][0])
+
+        def validate(value, path, errors):
+            if value is None:
+                return
+            if not isinstance(value, list):
+                errors.append(f"Value '{value}' is not a list. "
+                              f"Value path: '{path}'")
+                return
+            for i, item in enumerate(value):
+                validate_item(item, f'{path}/{i}', errors)
+    else:
+        value_type = {'str': str, 'bool': bool}[rule_type]
+
+        def validate(value, path, errors):
+            if value is not None and not isinstance(value, value_type):
+                errors.append(f"Value '{value}' is not of type "
+                              f"'{rule_type}'. Path: '{path}'")
+
+    return validate
+
+
+@functools.lru_cache(maxsize=None)
+def metadata_validator():
+    # Building the validator from the schema is done once, and not for
+    # every module as pykwalify.core.Core(...).validate() would.
+    return compile_rule(yaml_load(METADATA_SCHEMA))
+
+
+def validate_meta(meta):
+    # returns a list of errors, empty if meta matches METADATA_SCHEMA
+    errors = []
+    metadata_validator()(meta, '', errors)
+    return errors
+
+
+@functools.lru_cache(maxsize=None)
+def _isfile(path):
+    # The same paths are checked repeatedly while processing a module, so
+    # stat each distinct path only once.
+    return os.path.isfile(path)
+
+
+@functools.lru_cache(maxsize=None)
+def _zephyr_files(module):
+    # A single scan of the zephyr folder of a module tells which of the
+    # zephyr/module.yml, zephyr/CMakeLists.txt and zephyr/Kconfig files used
+    # by process_module(), process_cmake() and process_kconfig() exist.
+    #
+    # returns the set of file names, or None if the folder exists but could
+    # not be listed
+    try:
+        with os.scandir(os.path.join(module, 'zephyr')) as it:
+            return frozenset(entry.name for entry in it if entry.is_file())
+    except (FileNotFoundError, NotADirectoryError):
+        return frozenset()
+    except OSError:
+        return None
+
+
+def has_zephyr_file(module, name):
+    # Names are compared case sensitively, while the file systems on Windows
+    # and macOS usually are not, so stat the file there when not found. The
+    # file is also stat'ed if the folder could not be listed, e.g. due to
+    # missing read permission, as its files may still be accessible.
+    zephyr_files = _zephyr_files(module)
+    if zephyr_files is None:
+        return _isfile(os.path.join(module, 'zephyr', name))
+    if name in zephyr_files:
+        return True
+    return CASE_INSENSITIVE_FS and bool(zephyr_files) and \
+        _isfile(os.path.join(module, 'zephyr', name))
 
 
 def validate_setting(setting, module_path, filename=None):
@@ -106,11 +249,113 @@ def validate_setting(setting, module_path, filename=None):
             checkfile = os.path.join(module_path, setting, filename)
         else:
             checkfile = os.path.join(module_path, setting)
-        if not os.path.isfile(checkfile):
+        if not _isfile(checkfile):
             return False
     return True
 
 
+def user_cache_dir():
+    # Same lookup as find_appropriate_cache_directory() in
+    # cmake/extensions.cmake, except that no fallback inside ZEPHYR_BASE is
+    # used.
+    #
+    # returns the zephyr cache directory of the user, or None if not found
+    if sys.platform == 'darwin':
+        candidates = [('HOME', 'Library/Caches')]
+    elif sys.platform == 'win32':
+        candidates = [('LOCALAPPDATA', '.cache')]
+    else:
+        candidates = [('XDG_CACHE_HOME', ''), ('HOME', '.cache')]
+
+    for env_var, suffix in candidates:
+        env_dir = os.environ.get(env_var)
+        if env_dir is not None:
+            user_dir = os.path.join(env_dir, suffix)
+            if os.access(user_dir, os.W_OK):
+                return Path(user_dir) / 'zephyr'
+    return None
+
+
+def meta_cache_file(module_yml_text):
+    # Parsing and validating module.yml files is slow, so the validated
+    # content is cached in the user cache directory. The cache file is
+    # named after a hash of the module.yml content and of the schema it was
+    # validated against, so any change results in a cache miss.
+    #
+    # returns the path of the cache file, or None if caching is disabled
+    # or unavailable
+    if os.environ.get('ZEPHYR_MODULE_CACHE_DISABLE'):
+        return None
+
+    cache_dir = user_cache_dir()
+    if cache_dir is None:
+        return None
+
+    key = METADATA_SCHEMA + module_yml_text
+    digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+    return cache_dir / 'module_meta' / digest
+
+
+def read_meta_cache(cache_file):
+    if cache_file is None:
+        return None
+
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(meta, dict):
+        return None
+
+    # Mark the entry as used, see prune_meta_cache().
+    try:
+        os.utime(cache_file)
+    except OSError:
+        pass
+    return meta
+
+
+def write_meta_cache(cache_file, meta):
+    # The cache is only an optimization, so failing to write it is not an
+    # error. The file is written under a temporary name and renamed, so
+    # concurrent builds never read a partially written file.
+    if cache_file is None:
+        return
+
+    tmp_file = cache_file.with_name(f'{cache_file.name}.{os.getpid()}.tmp')
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        try:
+            os.remove(tmp_file)
+        except OSError:
+            pass
+        return
+
+    prune_meta_cache(cache_file.parent)
+
+
+def prune_meta_cache(cache_dir):
+    # Every change to a module.yml file adds a new cache entry, so remove
+    # entries which have not been used for META_CACHE_MAX_AGE seconds.
+    # This only runs after a cache miss, which is rare.
+    expired = time.time() - META_CACHE_MAX_AGE
+    try:
+        with os.scandir(cache_dir) as it:
+            for entry in it:
+                try:
+                    if entry.stat().st_mtime < expired:
+                        os.remove(entry.path)
+                except OSError:
+                    pass
+    except OSError:
+        pass
+
+
 def process_module(module):
     module_path = PurePath(module)
     module_yml = module_path.joinpath('zephyr/module.yml')
@@ -118,25 +363,32 @@ def process_module(module):
     # The input is a module if zephyr/module.yml is a valid yaml file
     # or if both zephyr/CMakeLists.txt and zephyr/Kconfig are present.
 
-    if Path(module_yml).is_file():
+    if has_zephyr_file(module, 'module.yml'):
         with Path(module_yml).open('r') as f:
-            meta = yaml.safe_load(f.read())
+            module_yml_text = f.read()
 
-        try:
-            pykwalify.core.Core(source_data=meta, schema_data=schema)\
-                .validate()
-        except pykwalify.errors.SchemaError as e:
-            sys.exit('ERROR: Malformed "build" section in file: {}\n{}'
-                     .format(module_yml.as_posix(), e))
+        cache_file = meta_cache_file(module_yml_text)
+        meta = read_meta_cache(cache_file)
+        if meta is None:
+            meta = yaml_load(module_yml_text)
+
+            errors = validate_meta(meta)
+            if errors:
+                sys.exit('ERROR: Malformed "build" section in file: {}\n'
+                         'Schema validation failed:\n - {}.'
+                         .format(module_yml.as_posix(),
+                                 '.\n - '.join(errors)))
+
+            write_meta_cache(cache_file, meta)
 
         meta['name'] = meta.get('name', module_path.name)
-        meta['name-sanitized'] = re.sub('[^a-zA-Z0-9]', '_', meta['name'])
+        meta['name-sanitized'] = NAME_SANITIZE_RE.sub('_', meta['name'])
         return meta
 
-    if Path(module_path.joinpath('zephyr/CMakeLists.txt')).is_file() and \
-       Path(module_path.joinpath('zephyr/Kconfig')).is_file():
+    if has_zephyr_file(module, 'CMakeLists.txt') and \
+       has_zephyr_file(module, 'Kconfig'):
         return {'name': module_path.name,
-                'name-sanitized': re.sub('[^a-zA-Z0-9]', '_', module_path.name),
+                'name-sanitized': NAME_SANITIZE_RE.sub('_', module_path.name),
                 'build': {'cmake': 'zephyr', 'kconfig': 'zephyr/Kconfig'}}
 
     return None
@@ -144,33 +396,30 @@ def process_module(module):
 
 def process_cmake(module, meta):
     section = meta.get('build', dict())
-    module_path = PurePath(module)
-    module_yml = module_path.joinpath('zephyr/module.yml')
+    module_path = PurePath(module).as_posix()
 
     cmake_extern = section.get('cmake-ext', False)
     if cmake_extern:
-        return('\"{}\":\"{}\":\"{}\"\n'
-               .format(meta['name'],
-                       module_path.as_posix(),
-                       "${ZEPHYR_" + meta['name-sanitized'].upper() + "_CMAKE_DIR}"))
+        cmake_dir = f"${{ZEPHYR_{meta['name-sanitized'].upper()}_CMAKE_DIR}}"
+        return f'"{meta["name"]}":"{module_path}":"{cmake_dir}"\n'
 
     cmake_setting = section.get('cmake', None)
     if not validate_setting(cmake_setting, module, 'CMakeLists.txt'):
         sys.exit('ERROR: "cmake" key in {} has folder value "{}" which '
                  'does not contain a CMakeLists.txt file.'
-                 .format(module_yml.as_posix(), cmake_setting))
+                 .format(PurePath(module, 'zephyr/module.yml').as_posix(),
+                         cmake_setting))
 
     cmake_path = os.path.join(module, cmake_setting or 'zephyr')
-    cmake_file = os.path.join(cmake_path, 'CMakeLists.txt')
-    if os.path.isfile(cmake_file):
-        return('\"{}\":\"{}\":\"{}\"\n'
-               .format(meta['name'],
-                       module_path.as_posix(),
-                       Path(cmake_path).resolve().as_posix()))
+    if cmake_setting is None:
+        has_cmakelists = has_zephyr_file(module, 'CMakeLists.txt')
+    else:
+        has_cmakelists = _isfile(os.path.join(cmake_path, 'CMakeLists.txt'))
+    if has_cmakelists:
+        cmake_dir = os.path.abspath(cmake_path).replace(os.sep, '/')
+        return f'"{meta["name"]}":"{module_path}":"{cmake_dir}"\n'
     else:
-        return('\"{}\":\"{}\":\"\"\n'
-               .format(meta['name'],
-                       module_path.as_posix()))
+        return f'"{meta["name"]}":"{module_path}":""\n'
 
 
 def process_settings(module, meta):
@@ -179,10 +428,11 @@ def process_settings(module, meta):
     out_text = ""
 
     if build_settings is not None:
+        module_path = PurePath(module)
         for root in ['board', 'dts', 'soc', 'arch', 'module_ext']:
             setting = build_settings.get(root+'_root', None)
             if setting is not None:
-                root_path = PurePath(module) / setting
+                root_path = module_path / setting
                 out_text += f'"{root.upper()}_ROOT":'
                 out_text += f'"{root_path.as_posix()}"\n'
 
@@ -206,7 +456,6 @@ def kconfig_snippet(meta, path, kconfig_file=None):
 def process_kconfig(module, meta):
     section = meta.get('build', dict())
     module_path = PurePath(module)
-    module_yml = module_path.joinpath('zephyr/module.yml')
     kconfig_extern = section.get('kconfig-ext', False)
     if kconfig_extern:
         return kconfig_snippet(meta, module_path)
@@ -215,35 +464,108 @@ def process_kconfig(module, meta):
     if not validate_setting(kconfig_setting, module):
         sys.exit('ERROR: "kconfig" key in {} has value "{}" which does '
                  'not point to a valid Kconfig file.'
-                 .format(module_yml, kconfig_setting))
+                 .format(module_path.joinpath('zephyr/module.yml'),
+                         kconfig_setting))
 
     kconfig_file = os.path.join(module, kconfig_setting or 'zephyr/Kconfig')
-    if os.path.isfile(kconfig_file):
+    if kconfig_setting is None:
+        has_kconfig = has_zephyr_file(module, 'Kconfig')
+    else:
+        has_kconfig = _isfile(kconfig_file)
+    if has_kconfig:
         return kconfig_snippet(meta, module_path, Path(kconfig_file))
     else:
         return ""
 
 
 def process_twister(module, meta):
-
-    out = ""
     tests = meta.get('tests', [])
     samples = meta.get('samples', [])
     boards = meta.get('boards', [])
+    if not (tests or samples or boards):
+        return ""
 
-    for pth in tests + samples:
-        if pth:
-            dir = os.path.join(module, pth)
-            out += '-T\n{}\n'.format(PurePath(os.path.abspath(dir))
-                                     .as_posix())
+    out = []
+    # Make the module path absolute once, instead of calling abspath(), and
+    # thereby getcwd(), for every path.
+    module_dir = os.path.abspath(module)
 
-    for pth in boards:
-        if pth:
-            dir = os.path.join(module, pth)
-            out += '--board-root\n{}\n'.format(PurePath(os.path.abspath(dir))
-                                               .as_posix())
+    for option, paths in (('-T', tests + samples), ('--board-root', boards)):
+        for pth in paths:
+            if pth:
+                dir = os.path.normpath(os.path.join(module_dir, pth))
+                posix_path = dir.replace(os.sep, '/')
+                out.append(f'{option}\n{posix_path}\n')
 
-    return out
+    return ''.join(out)
+
+
+def git_head(path):
+    # Resolve HEAD of the git repository at path by reading the files in
+    # .git directly, which avoids spawning git for the common cases of a
+    # detached HEAD or a branch with a loose or packed ref.
+    #
+    # returns the SHA, or None if HEAD could not be resolved this way
+    git_dir = Path(path or os.curdir) / '.git'
+    try:
+        head = (git_dir / 'HEAD').read_text().strip()
+    except OSError:
+        return None
+
+    if not head.startswith('ref: '):
+        return head if GIT_SHA_RE.fullmatch(head) else None
+
+    ref = head[len('ref: '):]
+    try:
+        sha = (git_dir / ref).read_text().strip()
+        return sha if GIT_SHA_RE.fullmatch(sha) else None
+    except OSError:
+        pass
+
+    try:
+        with open(git_dir / 'packed-refs', 'r') as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) == 2 and fields[1] == ref:
+                    sha = fields[0]
+                    return sha if GIT_SHA_RE.fullmatch(sha) else None
+    except OSError:
+        pass
+    return None
+
+
+def git_revision(path):
+    # Checking for a .git entry in path or one of its parents is much cheaper
+    # than spawning git, and most paths which are not in a git repository,
+    # such as unversioned extra modules, are ruled out this way. Symbolic
+    # links are resolved first, as git looks for the repository from the
+    # real location.
+    real_path = Path(os.path.realpath(path or os.curdir))
+    if not any((p / '.git').exists() for p in (real_path, *real_path.parents)):
+        return None
+
+    revision = git_head(path)
+    git = ['git', '-C', path or os.curdir]
+    if revision is None:
+        result = subprocess.run(git + ['rev-parse', '--is-inside-work-tree',
+                                       'HEAD'],
+                                capture_output=True, text=True)
+        if result.returncode or result.stderr:
+            return None
+
+        # A git repo, the second line is the HEAD revision.
+        revision = result.stdout.split()[-1]
+
+    # git diff-index returns 1 for a dirty tree. Any other error means git
+    # can not use the repository, e.g. due to an unsafe ownership, which
+    # would otherwise have been detected by git rev-parse.
+    result = subprocess.run(git + ['diff-index', '--quiet', 'HEAD', '--'],
+                            stderr=subprocess.DEVNULL)
+    if result.returncode == 1:
+        return revision + '-dirty'
+    if result.returncode:
+        return None
+    return revision
 
 
 def process_meta(zephyr_base, west_projects, modules):
@@ -259,53 +581,37 @@ def process_meta(zephyr_base, west_projects, modules):
 
     meta = {'zephyr': None, 'modules': None, 'west': None}
 
-    def git_revision(path):
-        rc = subprocess.Popen(['git', 'rev-parse', '--is-inside-work-tree'],
-                              stdout=subprocess.PIPE,
-                              stderr=subprocess.PIPE,
-                              cwd=path).wait()
-        if rc == 0:
-            # A git repo.
-            popen = subprocess.Popen(['git', 'rev-parse', 'HEAD'],
-                                     stdout=subprocess.PIPE,
-                                     stderr=subprocess.PIPE,
-                                     cwd=path)
-            stdout, stderr = popen.communicate()
-            stdout = stdout.decode('utf-8')
-
-            if not (popen.returncode or stderr):
-                revision = stdout.rstrip()
-
-                rc = subprocess.Popen(['git', 'diff-index', '--quiet', 'HEAD',
-                                       '--'],
-                                      stdout=None,
-                                      stderr=None,
-                                      cwd=path).wait()
-                if rc:
-                    return revision + '-dirty'
-                return revision
-        return None
+    west_paths = []
+    if west_projects is not None:
+        west_paths = [PurePath(project).as_posix()
+                      for project in west_projects['projects']]
+    module_paths = [PurePath(module.project).as_posix() for module in modules]
+
+    # Looking up a revision is I/O bound, mostly waiting on git, so look up
+    # all paths concurrently.
+    paths = list(dict.fromkeys([zephyr_base] + west_paths + module_paths))
+    workers = min(32, (os.cpu_count() or 1) * 4)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as ex:
+        revisions = dict(zip(paths, ex.map(git_revision, paths)))
 
     meta_project = {'path': zephyr_base,
-                    'revision': git_revision(zephyr_base)}
+                    'revision': revisions[zephyr_base]}
     meta['zephyr'] = meta_project
 
     if west_projects is not None:
         meta_projects = []
-        for project in west_projects['projects']:
-            project_path = PurePath(project).as_posix()
+        for project_path in west_paths:
             meta_project = {'path': project_path,
-                            'revision': git_revision(project_path)}
+                            'revision': revisions[project_path]}
             meta_projects.append(meta_project)
         meta['west'] = {'manifest': west_projects['manifest'],
                         'projects': meta_projects}
 
     meta_projects = []
-    for module in modules:
-        module_path = PurePath(module.project).as_posix()
+    for module, module_path in zip(modules, module_paths):
         meta_project = {'name': module.meta['name'],
                         'path': module_path,
-                        'revision': git_revision(module_path)}
+                        'revision': revisions[module_path]}
         meta_projects.append(meta_project)
     meta['modules'] = meta_projects
 
@@ -349,8 +655,9 @@ def parse_modules(zephyr_base, modules=None, extra_modules=None):
     Module = namedtuple('Module', ['project', 'meta', 'depends'])
     # dep_modules is a list of all modules that has an unresolved dependency
     dep_modules = []
-    # start_modules is a list modules with no depends left (no incoming edge)
-    start_modules = []
+    # start_modules is a queue of modules with no depends left (no incoming
+    # edge)
+    start_modules = deque()
     # sorted_modules is a topological sorted list of the modules
     sorted_modules = []
 
@@ -371,22 +678,24 @@ def parse_modules(zephyr_base, modules=None, extra_modules=None):
             sys.exit(f'{project}, given in ZEPHYR_EXTRA_MODULES, '
                      'is not a valid zephyr module')
 
+    # dependents maps a module name to the modules which depends on it
+    dependents = defaultdict(list)
+    for module in dep_modules:
+        for dep in set(module.depends):
+            dependents[dep].append(module)
+
     # This will do a topological sort to ensure the modules are ordered
     # according to dependency settings.
     while start_modules:
-        node = start_modules.pop(0)
+        node = start_modules.popleft()
         sorted_modules.append(node)
         node_name = node.meta['name']
-        to_remove = []
-        for module in dep_modules:
-            if node_name in module.depends:
-                module.depends.remove(node_name)
-                if not module.depends:
-                    start_modules.append(module)
-                    to_remove.append(module)
-        for module in to_remove:
-            dep_modules.remove(module)
+        for module in dependents.pop(node_name, []):
+            module.depends.remove(node_name)
+            if not module.depends:
+                start_modules.append(module)
 
+    dep_modules = [module for module in dep_modules if module.depends]
     if dep_modules:
         # If there are any modules with unresolved dependencies, then the
         # modules contains unmet or cyclic dependencies. Error out.
@@ -429,10 +738,10 @@ def main():
                         help='Path to zephyr repository')
     args = parser.parse_args()
 
-    kconfig = ""
-    cmake = ""
-    settings = ""
-    twister = ""
+    kconfig = []
+    cmake = []
+    settings = []
+    twister = []
 
     west_proj = None
     if args.modules is None:
@@ -445,18 +754,18 @@ def main():
                                 args.extra_modules)
 
     for module in modules:
-        kconfig += process_kconfig(module.project, module.meta)
-        cmake += process_cmake(module.project, module.meta)
-        settings += process_settings(module.project, module.meta)
-        twister += process_twister(module.project, module.meta)
+        kconfig.append(process_kconfig(module.project, module.meta))
+        cmake.append(process_cmake(module.project, module.meta))
+        settings.append(process_settings(module.project, module.meta))
+        twister.append(process_twister(module.project, module.meta))
 
     if args.kconfig_out:
         with open(args.kconfig_out, 'w', encoding="utf-8") as fp:
-            fp.write(kconfig)
+            fp.write(''.join(kconfig))
 
     if args.cmake_out:
         with open(args.cmake_out, 'w', encoding="utf-8") as fp:
-            fp.write(cmake)
+            fp.write(''.join(cmake))
 
     if args.settings_out:
         with open(args.settings_out, 'w', encoding="utf-8") as fp:
@@ -470,16 +779,16 @@ def main():
 #
 # See the Modules guide for more information.
 ''')
-            fp.write(settings)
+            fp.write(''.join(settings))
 
     if args.twister_out:
         with open(args.twister_out, 'w', encoding="utf-8") as fp:
-            fp.write(twister)
+            fp.write(''.join(twister))
 
     if args.meta_out:
         meta = process_meta(args.zephyr_base, west_proj, modules)
         with open(args.meta_out, 'w', encoding="utf-8") as fp:
-            fp.write(yaml.dump(meta))
+            fp.write(yaml_dump(meta))
 
 
 if __name__ == "__main__":